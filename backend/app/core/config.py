@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import List, Optional
+from typing import FrozenSet, Optional
 
 
 class Settings(BaseSettings):
@@ -33,8 +33,8 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     
-    # CORS Configuration
-    cors_origins: List[str] = ["http://localhost:3000", "http://frontend:3000","http://localhost:3001"]
+    # CORS Configuration (a set, so origin checks are O(1) membership tests)
+    cors_origins: FrozenSet[str] = frozenset({"http://localhost:3000", "http://frontend:3000","http://localhost:3001"})
     
     # Agent Configuration
     agent_max_iterations: int = 10
@@ -1,13 +1,19 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import logging
 import uuid
 from datetime import datetime
 
 from app.core.config import settings
 from app.middleware.auth import AuthMiddleware
-from app.routers import auth, health, chat
+from app.middleware.compression import SSEAwareGZipMiddleware
+from app.routers import auth, health, chat, batch
+from app.services.http_client import close_http_client, get_http_client
+from app.services.db.supabase_client import supabase_client
+from app.services.agent.react_agent import react_agent
 
 # Configure logging
 logging.basicConfig(
@@ -16,11 +22,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize application on startup and clean up on shutdown."""
+    logger.info("=" * 50)
+    logger.info("Starting LangChain ReAct Chatbot")
+    logger.info(f"Environment: {settings.environment}")
+    logger.info(f"MCP URL: {settings.mcp_url}")
+    logger.info(f"CORS Origins: {settings.cors_origins}")
+    logger.info("=" * 50)
+    
+    # Create the shared keep-alive HTTP client for outbound calls
+    get_http_client()
+    
+    # Open backend connections before serving traffic so the first
+    # requests don't all pay (and race on) connection setup
+    await asyncio.to_thread(supabase_client.warm_up)
+    if react_agent.groq_api_key:
+        _ = react_agent.groq_client  # property creates the client on first access
+    
+    yield
+    
+    logger.info("Shutting down LangChain ReAct Chatbot")
+    await react_agent.aclose()
+    await close_http_client()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="LangChain ReAct Chatbot",
     description="A full-stack LangChain ReAct chatbot with streaming responses",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add authentication middleware (must be added BEFORE CORS so it runs after CORS)
@@ -31,9 +66,18 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
-    expose_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    expose_headers=["X-Request-ID"],
+    max_age=86400,  # let browsers cache preflight responses for a day
+)
+
+# Compress large JSON responses (e.g. long message histories); the SSE
+# stream is excluded so tokens are flushed as soon as they're produced
+app.add_middleware(
+    SSEAwareGZipMiddleware,
+    minimum_size=1024,
+    exclude_paths=("/chat/message",),
 )
 
 
@@ -57,27 +101,11 @@ async def log_requests(request: Request, call_next):
     return response
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize application on startup."""
-    logger.info("=" * 50)
-    logger.info("Starting LangChain ReAct Chatbot")
-    logger.info(f"Environment: {settings.environment}")
-    logger.info(f"MCP URL: {settings.mcp_url}")
-    logger.info(f"CORS Origins: {settings.cors_origins}")
-    logger.info("=" * 50)
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown."""
-    logger.info("Shutting down LangChain ReAct Chatbot")
-
-
 # Include routers
 app.include_router(auth.router)
 app.include_router(health.router)
 app.include_router(chat.router)
+app.include_router(batch.router)
 
 
 @app.get("/")
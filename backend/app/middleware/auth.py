@@ -1,12 +1,18 @@
 from fastapi import Request, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import JSONResponse
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError as JWTError
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.backends import default_backend
+import base64
 import logging
-from typing import Optional
-import httpx
+import orjson
+import time
+from typing import Dict, Optional, Tuple
 
 from app.core.config import settings
+from app.services.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +26,33 @@ PUBLIC_ROUTES = {
     "/auth/login",
 }
 
-# Cache for Supabase public keys
+# JWT decode arguments, built once instead of per request
+_JWT_ALGORITHMS = ("ES256",)
+_JWT_DECODE_OPTIONS = {"verify_aud": False}
+
+# Supabase JWKS endpoint and the headers it requires
+_JWKS_URL = f"{settings.supabase_url}/auth/v1/.well-known/jwks.json"
+_JWKS_HEADERS = {"apikey": settings.supabase_key}
+
+# Cache for Supabase public keys, as ready-to-use key objects keyed by kid
 _public_keys_cache = {}
 
+# Cache of already-verified tokens: token -> (user_id, exp)
+_validated_tokens_cache: Dict[str, Tuple[str, int]] = {}
+_VALIDATED_TOKENS_CACHE_SIZE = 4096
+
+
+def _jwk_to_public_key(jwk: Dict[str, str]) -> ec.EllipticCurvePublicKey:
+    """Construct an ES256 (P-256) public key from its JWK x/y coordinates."""
+    x = base64.urlsafe_b64decode(jwk["x"] + "==")
+    y = base64.urlsafe_b64decode(jwk["y"] + "==")
+    
+    x_int = int.from_bytes(x, byteorder='big')
+    y_int = int.from_bytes(y, byteorder='big')
+    
+    public_numbers = ec.EllipticCurvePublicNumbers(x_int, y_int, ec.SECP256R1())
+    return public_numbers.public_key(default_backend())
+
 
 class AuthMiddleware:
     """Middleware for JWT token validation and user context injection."""
@@ -36,28 +66,30 @@ class AuthMiddleware:
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope, receive)
+        # Read method/path straight from the ASGI scope; no Request object needed
+        method = scope["method"]
+        path = scope["path"]
         
-        logger.info(f"=== MIDDLEWARE CHECK: {request.method} {request.url.path} ===")
+        logger.info(f"=== MIDDLEWARE CHECK: {method} {path} ===")
         
         # Allow CORS preflight requests to pass through
-        if request.method == "OPTIONS":
+        if method == "OPTIONS":
             logger.info("OPTIONS request, passing through")
             await self.app(scope, receive, send)
             return
         
         # Check if route is public
-        if request.url.path in PUBLIC_ROUTES or request.url.path.startswith("/auth/"):
-            logger.info(f"Public route: {request.url.path}, passing through")
+        if path in PUBLIC_ROUTES or path.startswith("/auth/"):
+            logger.info(f"Public route: {path}, passing through")
             await self.app(scope, receive, send)
             return
 
-        logger.info(f"Protected route: {request.url.path}, validating token...")
+        logger.info(f"Protected route: {path}, validating token...")
         
         # Extract and validate token
-        token = self._extract_token(request)
+        token = self._extract_token(scope)
         if not token:
-            logger.warning(f"No token found for {request.url.path}")
+            logger.warning(f"No token found for {path}")
             response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "Authorization required"},
@@ -71,7 +103,7 @@ class AuthMiddleware:
         # Validate token and extract user_id
         user_id = await self._validate_token(token)
         if not user_id:
-            logger.warning(f"Token validation failed for {request.url.path}")
+            logger.warning(f"Token validation failed for {path}")
             response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "Invalid authorization token"},
@@ -90,27 +122,41 @@ class AuthMiddleware:
         await self.app(scope, receive, send)
 
     @staticmethod
-    def _extract_token(request: Request) -> Optional[str]:
-        """Extract JWT token from Authorization header."""
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            logger.debug(f"No Authorization header for {request.url.path}")
+    def _extract_token(scope) -> Optional[str]:
+        """Extract JWT token from the raw ASGI Authorization header."""
+        # ASGI header names are already lowercased, so a single pass over the
+        # raw list finds the header without building a Headers mapping
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                break
+        else:
+            logger.debug(f"No Authorization header for {scope['path']}")
             return None
 
-        try:
-            scheme, token = auth_header.split()
-            if scheme.lower() != "bearer":
-                logger.debug(f"Invalid auth scheme: {scheme}")
-                return None
-            logger.debug(f"Token extracted for {request.url.path}")
-            return token
-        except ValueError:
+        # Only lowercase the 7-byte scheme prefix, not the whole header
+        if len(value) < 8 or value[:7].lower() != b"bearer ":
             logger.debug("Invalid Authorization header format")
             return None
+        logger.debug(f"Token extracted for {scope['path']}")
+        return value[7:].decode("latin-1")
 
     @staticmethod
     async def _validate_token(token: str) -> Optional[str]:
         """Validate JWT token and extract user_id."""
+        # Tokens are reused until they expire, so skip re-verification on a hit
+        cached = _validated_tokens_cache.get(token)
+        if cached:
+            user_id, exp = cached
+            if exp > time.time():
+                return user_id
+            _validated_tokens_cache.pop(token, None)
+
+        # A JWS compact token is exactly three dot-separated segments; reject
+        # anything else before handing it to PyJWT
+        if token.count(".") != 2:
+            logger.warning("Malformed token rejected")
+            return None
+
         try:
             logger.info("=== TOKEN VALIDATION START ===")
             logger.info(f"Token (first 50 chars): {token[:50]}...")
@@ -134,32 +180,34 @@ class AuthMiddleware:
             if kid not in _public_keys_cache:
                 logger.info(f"Kid not in cache, fetching from Supabase...")
                 try:
-                    async with httpx.AsyncClient() as client:
-                        # Use the correct Supabase JWKS endpoint with API key
-                        jwks_url = f"{settings.supabase_url}/auth/v1/.well-known/jwks.json"
-                        logger.info(f"JWKS URL: {jwks_url}")
-                        logger.info(f"Using API key (first 20 chars): {settings.supabase_key[:20]}...")
-                        
-                        response = await client.get(
-                            jwks_url,
-                            headers={"apikey": settings.supabase_key},
-                            timeout=10
-                        )
-                        logger.info(f"JWKS response status: {response.status_code}")
+                    # Use the correct Supabase JWKS endpoint with API key
+                    logger.info(f"JWKS URL: {_JWKS_URL}")
+                    logger.info(f"Using API key (first 20 chars): {settings.supabase_key[:20]}...")
+                    
+                    response = await get_http_client().get(
+                        _JWKS_URL,
+                        headers=_JWKS_HEADERS,
+                        timeout=10
+                    )
+                    logger.info(f"JWKS response status: {response.status_code}")
+                    
+                    if response.status_code != 200:
+                        logger.error(f"Failed to fetch JWKS: {response.status_code}")
+                        logger.error(f"Response text: {response.text}")
+                        return None
+                    
+                    jwks = orjson.loads(response.content)
+                    available_kids = [k['kid'] for k in jwks.get('keys', [])]
+                    logger.info(f"JWKS keys available: {available_kids}")
+                    
+                    for key in jwks.get("keys", []):
+                        try:
+                            _public_keys_cache[key["kid"]] = _jwk_to_public_key(key)
+                        except (KeyError, ValueError) as e:
+                            logger.warning(f"Skipping unsupported JWK {key.get('kid')}: {str(e)}")
+                            continue
+                        logger.info(f"Cached key: {key['kid']}")
                         
-                        if response.status_code != 200:
-                            logger.error(f"Failed to fetch JWKS: {response.status_code}")
-                            logger.error(f"Response text: {response.text}")
-                            return None
-                        
-                        jwks = response.json()
-                        available_kids = [k['kid'] for k in jwks.get('keys', [])]
-                        logger.info(f"JWKS keys available: {available_kids}")
-                        
-                        for key in jwks.get("keys", []):
-                            _public_keys_cache[key["kid"]] = key
-                            logger.info(f"Cached key: {key['kid']}")
-                            
                 except Exception as e:
                     logger.error(f"Error fetching JWKS: {str(e)}")
                     import traceback
@@ -175,37 +223,17 @@ class AuthMiddleware:
             
             logger.info(f"Using cached public key for kid: {kid}")
             
-            # Get the public key
-            public_key_data = _public_keys_cache[kid]
-            
-            # Construct the public key from JWK
-            from cryptography.hazmat.primitives.asymmetric import ec
-            from cryptography.hazmat.backends import default_backend
-            import base64
-            import json
-            
-            logger.info("Reconstructing public key from JWK...")
-            
-            # For ES256, we need to reconstruct the public key from x and y coordinates
-            x = base64.urlsafe_b64decode(public_key_data["x"] + "==")
-            y = base64.urlsafe_b64decode(public_key_data["y"] + "==")
-            
-            # Create the public key
-            x_int = int.from_bytes(x, byteorder='big')
-            y_int = int.from_bytes(y, byteorder='big')
+            # Get the public key (constructed once when the JWKS was fetched)
+            public_key = _public_keys_cache[kid]
             
-            public_numbers = ec.EllipticCurvePublicNumbers(x_int, y_int, ec.SECP256R1())
-            public_key = public_numbers.public_key(default_backend())
-            
-            logger.info("Public key reconstructed successfully")
             logger.info("Verifying and decoding token...")
             
             # Verify and decode the token
             payload = jwt.decode(
                 token,
                 public_key,
-                algorithms=["ES256"],
-                options={"verify_aud": False}
+                algorithms=_JWT_ALGORITHMS,
+                options=_JWT_DECODE_OPTIONS,
             )
             
             logger.info(f"Token payload: {payload}")
@@ -215,14 +243,20 @@ class AuthMiddleware:
                 logger.warning("Token missing 'sub' claim")
                 return None
             
+            exp = payload.get("exp")
+            if exp:
+                if len(_validated_tokens_cache) >= _VALIDATED_TOKENS_CACHE_SIZE:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    _validated_tokens_cache.pop(next(iter(_validated_tokens_cache)))
+                _validated_tokens_cache[token] = (user_id, exp)
+            
             logger.info(f"Token validated successfully for user: {user_id}")
             logger.info("=== TOKEN VALIDATION SUCCESS ===")
             return user_id
             
         except JWTError as e:
-            logger.error(f"JWT Error during token validation: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            # Expected for bad/expired tokens, so skip the traceback formatting
+            logger.warning(f"JWT Error during token validation: {str(e)}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error during token validation: {str(e)}")
@@ -231,22 +265,28 @@ class AuthMiddleware:
             return None
 
 
-def get_user_id(request: Request) -> str:
-    """Get user_id from request state."""
-    # Try to get from request.state first (set by middleware)
-    user_id = getattr(request.state, "user_id", None)
-    if user_id:
-        logger.info(f"User ID from request.state: {user_id}")
-        return user_id
+async def authorize(request: Request) -> str:
+    """
+    FastAPI dependency resolving the authenticated user_id once per request.
+    
+    Reuses the user_id the middleware already validated (or the one stored
+    by an earlier call in the same request) and only decodes the token
+    itself when neither is present. The result is stored on request.state.
+    """
+    user_id = getattr(request.state, "user_id", None) or request.scope.get("user_id")
+    
+    if not user_id:
+        token = AuthMiddleware._extract_token(request.scope)
+        if token:
+            user_id = await AuthMiddleware._validate_token(token)
     
-    # Try to get from scope (ASGI level)
-    user_id = request.scope.get("user_id")
-    if user_id:
-        logger.info(f"User ID from scope: {user_id}")
-        return user_id
+    if not user_id:
+        logger.error("User not authenticated - no user_id found")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    logger.error("User not authenticated - no user_id found")
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="User not authenticated",
-    )
+    request.state.user_id = user_id
+    return user_id
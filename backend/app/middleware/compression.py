@@ -0,0 +1,29 @@
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Iterable
+
+
+class SSEAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip middleware that leaves Server-Sent Events streams uncompressed.
+
+    Starlette's GZipMiddleware also compresses streaming responses, and the
+    compressor holds back small SSE frames until its buffer fills, which
+    stalls token streaming. Paths in exclude_paths bypass compression.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        compresslevel: int = 9,
+        exclude_paths: Iterable[str] = (),
+    ) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
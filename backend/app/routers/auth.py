@@ -5,10 +5,12 @@ from typing import Dict, Any
 
 from app.schemas.auth import SignupRequest, LoginRequest, AuthResponse
 from app.services.db.supabase_client import supabase_client
+from app.utils.routing import ORJSONRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+# Auth request bodies are decoded with orjson rather than stdlib json
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=ORJSONRoute)
 
 
 @router.options("/signup")
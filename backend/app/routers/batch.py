@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.exceptions import RequestValidationError
+import asyncio
+import logging
+from typing import Dict, Any
+from urllib.parse import urlsplit
+import orjson
+from starlette.exceptions import HTTPException
+
+from app.schemas.batch import BatchRequest, BatchRequestItem, BatchResponse
+from app.middleware.auth import authorize
+from app.utils.routing import ORJSONRoute
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["batch"], route_class=ORJSONRoute)
+
+# Sub-requests are limited to the JSON chat endpoints; the SSE message
+# stream can't be collected into a single batch response
+_BATCH_METHODS = {"GET", "POST"}
+_BATCH_PREFIX = "/chat/"
+_BATCH_EXCLUDED = {"/chat/message"}
+
+
+async def _dispatch(request: Request, user_id: str, item: BatchRequestItem) -> Dict[str, Any]:
+    """Run one sub-request through the app router and collect its response."""
+    method = item.method.upper()
+    parts = urlsplit(item.url)
+    path = parts.path
+
+    if method not in _BATCH_METHODS or not path.startswith(_BATCH_PREFIX) or path in _BATCH_EXCLUDED:
+        return {"id": item.id, "status": 400, "body": {"detail": "Request not allowed in batch"}}
+
+    body = orjson.dumps(item.body) if item.body is not None else b""
+    headers = [(b"content-type", b"application/json")] if body else []
+
+    # The batch request was already authenticated, so sub-requests go
+    # straight to the router with the user_id that authorize() reads
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": method,
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": parts.query.encode(),
+        "headers": headers,
+        "app": request.app,
+        "state": {},
+        "user_id": user_id,
+    }
+
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        return {"type": "http.disconnect"}
+
+    status_code = 500
+    chunks = []
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app.router(scope, receive, send)
+    except HTTPException as e:
+        return {"id": item.id, "status": e.status_code, "body": {"detail": e.detail}}
+    except RequestValidationError as e:
+        return {"id": item.id, "status": 422, "body": {"detail": e.errors()}}
+    except Exception as e:
+        logger.error(f"Batch sub-request {method} {path} failed: {str(e)}", exc_info=True)
+        return {"id": item.id, "status": 500, "body": {"detail": "Internal server error"}}
+
+    raw = b"".join(chunks)
+    return {"id": item.id, "status": status_code, "body": orjson.loads(raw) if raw else None}
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def batch(
+    request: BatchRequest,
+    req: Request,
+    user_id: str = Depends(authorize),
+) -> Dict[str, Any]:
+    """
+    Execute several chat API calls in one round trip.
+
+    - **requests**: Up to 20 sub-requests, each with `id`, `url`, `method` and optional `body`
+
+    Sub-requests run concurrently under the caller's identity (the chat
+    handlers run their Supabase calls in worker threads). Returns one
+    `{id, status, body}` entry per sub-request, in request order.
+    """
+    responses = await asyncio.gather(
+        *(_dispatch(req, user_id, item) for item in request.requests)
+    )
+    return {"responses": responses}
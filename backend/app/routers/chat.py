@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import StreamingResponse
 import logging
 from typing import Dict, Any, AsyncGenerator
-import json
+import asyncio
+import orjson
 
 from app.schemas.chat import (
     ChatMessageRequest,
@@ -10,19 +11,25 @@ from app.schemas.chat import (
     ConversationResponse,
     MessageResponse,
 )
-from app.middleware.auth import get_user_id
+from app.middleware.auth import authorize
+from app.utils.routing import ORJSONRoute
 from app.services.db.supabase_client import supabase_client
 from app.services.agent.react_agent import react_agent
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/chat", tags=["chat"])
+router = APIRouter(prefix="/chat", tags=["chat"], route_class=ORJSONRoute)
+
+
+def _sse_frame(event_type: str, event_data: Dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Events frame."""
+    return b"event: " + event_type.encode() + b"\ndata: " + orjson.dumps(event_data) + b"\n\n"
 
 
 @router.post("/conversations", response_model=ConversationResponse)
 async def create_conversation(
     request: ConversationCreate,
-    req: Request,
+    user_id: str = Depends(authorize),
 ) -> Dict[str, Any]:
     """
     Create a new conversation.
@@ -32,9 +39,9 @@ async def create_conversation(
     Returns the created conversation.
     """
     try:
-        user_id = get_user_id(req)
-        
-        conversation = supabase_client.create_conversation(
+        # Run in a thread: the write may back off and retry on rate limits
+        conversation = await asyncio.to_thread(
+            supabase_client.create_conversation,
             user_id=user_id,
             title=request.title,
         )
@@ -53,16 +60,16 @@ async def create_conversation(
 
 
 @router.get("/conversations")
-async def list_conversations(req: Request) -> Dict[str, Any]:
+async def list_conversations(user_id: str = Depends(authorize)) -> Dict[str, Any]:
     """
     List all conversations for the current user.
     
     Returns a list of conversations.
     """
     try:
-        user_id = get_user_id(req)
-        
-        conversations = supabase_client.get_conversations(user_id)
+        conversations = await asyncio.to_thread(
+            supabase_client.get_conversations, user_id
+        )
         
         return {
             "conversations": conversations,
@@ -81,7 +88,7 @@ async def list_conversations(req: Request) -> Dict[str, Any]:
 @router.get("/conversations/{conversation_id}/messages")
 async def get_messages(
     conversation_id: str,
-    req: Request,
+    user_id: str = Depends(authorize),
 ) -> Dict[str, Any]:
     """
     Get all messages for a conversation.
@@ -91,11 +98,9 @@ async def get_messages(
     Returns a list of messages.
     """
     try:
-        user_id = get_user_id(req)
-        
         # Verify user owns this conversation
-        conversation = supabase_client.get_conversation(
-            conversation_id, user_id
+        conversation = await asyncio.to_thread(
+            supabase_client.get_conversation, conversation_id, user_id
         )
         if not conversation:
             raise HTTPException(
@@ -103,8 +108,8 @@ async def get_messages(
                 detail="Conversation not found",
             )
         
-        messages = supabase_client.get_messages(
-            conversation_id, user_id
+        messages = await asyncio.to_thread(
+            supabase_client.get_messages, conversation_id, user_id
         )
         
         return {
@@ -126,6 +131,7 @@ async def get_messages(
 async def send_message(
     request: ChatMessageRequest,
     req: Request,
+    user_id: str = Depends(authorize),
 ) -> StreamingResponse:
     """
     Send a message and stream the agent response via SSE.
@@ -136,27 +142,21 @@ async def send_message(
     Returns Server-Sent Events stream with response tokens.
     """
     try:
-        user_id = get_user_id(req)
         request_id = getattr(req.state, "request_id", "unknown")
         
-        # Verify conversation exists and belongs to user
-        conversation = supabase_client.get_conversation(
-            request.conversation_id, user_id
+        # Save user message, if the conversation exists and belongs to user
+        message = await asyncio.to_thread(
+            supabase_client.save_user_message_if_owner,
+            request.conversation_id,
+            user_id,
+            request.content,
         )
-        if not conversation:
+        if not message:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Conversation not found",
             )
         
-        # Save user message
-        supabase_client.save_message(
-            conversation_id=request.conversation_id,
-            user_id=user_id,
-            role="user",
-            content=request.content,
-        )
-        
         logger.info(
             f"[{request_id}] Message received from user {user_id}: {len(request.content)} chars"
         )
@@ -171,21 +171,17 @@ async def send_message(
                     request.conversation_id,
                     user_id,
                 ):
-                    # Format as SSE
+                    # Format as SSE bytes so Starlette skips the encode pass
                     event_type = event.get("event", "message")
                     event_data = event.get("data", {})
                     
-                    sse_line = f"event: {event_type}\n"
-                    sse_line += f"data: {json.dumps(event_data)}\n\n"
-                    
-                    yield sse_line
+                    yield _sse_frame(event_type, event_data)
                     
-                    logger.debug(f"[{request_id}] SSE event: {event_type}")
+                    logger.debug("[%s] SSE event: %s", request_id, event_type)
                 
             except Exception as e:
-                logger.error(f"[{request_id}] Stream error: {str(e)}")
-                error_event = f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
-                yield error_event
+                logger.error("[%s] Stream error: %s", request_id, e)
+                yield _sse_frame("error", {"error": str(e)})
         
         return StreamingResponse(
             event_generator(),
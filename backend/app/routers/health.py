@@ -1,14 +1,33 @@
 from fastapi import APIRouter, status
+import asyncio
 import logging
+import time
 from typing import Dict, Any
-import httpx
 
 from app.core.config import settings
+from app.services.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["health"])
 
+# Latest health result reused by readiness probes for a short TTL
+_HEALTH_CACHE_TTL = 2.0
+_health_cache: Dict[str, Any] = {"t": 0.0, "v": None}
+_health_lock = asyncio.Lock()
+
+
+def _check_supabase() -> None:
+    """Run a simple query to verify Supabase connectivity (blocking)."""
+    from app.services.db.supabase_client import supabase_client
+    supabase_client.client.table("conversations").select("count", count="exact").limit(1).execute()
+
+
+async def _check_mcp() -> bool:
+    """Return whether the MCP service health endpoint responds with 200."""
+    response = await get_http_client().get(f"{settings.mcp_url}/health", timeout=5.0)
+    return response.status_code == 200
+
 
 @router.get("/health", status_code=status.HTTP_200_OK)
 async def health_check() -> Dict[str, Any]:
@@ -31,34 +50,47 @@ async def health_check() -> Dict[str, Any]:
         },
     }
     
-    # Check Supabase connectivity
-    try:
-        from app.services.db.supabase_client import supabase_client
-        # Try a simple query to verify connectivity
-        supabase_client.client.table("conversations").select("count", count="exact").limit(1).execute()
-        health_status["services"]["supabase"] = "healthy"
-    except Exception as e:
-        logger.warning(f"Supabase health check failed: {str(e)}")
+    # Check Supabase and MCP concurrently; each probe is independent I/O
+    supabase_result, mcp_result = await asyncio.gather(
+        asyncio.to_thread(_check_supabase),
+        _check_mcp(),
+        return_exceptions=True,
+    )
+    
+    if isinstance(supabase_result, Exception):
+        logger.warning(f"Supabase health check failed: {str(supabase_result)}")
         health_status["services"]["supabase"] = "unhealthy"
         health_status["status"] = "degraded"
+    else:
+        health_status["services"]["supabase"] = "healthy"
     
-    # Check MCP connectivity
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{settings.mcp_url}/health")
-            if response.status_code == 200:
-                health_status["services"]["mcp"] = "healthy"
-            else:
-                health_status["services"]["mcp"] = "unhealthy"
-                health_status["status"] = "degraded"
-    except Exception as e:
-        logger.warning(f"MCP health check failed: {str(e)}")
+    if isinstance(mcp_result, Exception):
+        logger.warning(f"MCP health check failed: {str(mcp_result)}")
+        health_status["services"]["mcp"] = "unhealthy"
+        health_status["status"] = "degraded"
+    elif mcp_result:
+        health_status["services"]["mcp"] = "healthy"
+    else:
         health_status["services"]["mcp"] = "unhealthy"
         health_status["status"] = "degraded"
     
     return health_status
 
 
+async def _cached_health_check() -> Dict[str, Any]:
+    """Return the latest health result, refreshing it at most every TTL."""
+    if time.monotonic() - _health_cache["t"] < _HEALTH_CACHE_TTL:
+        return _health_cache["v"]
+    
+    async with _health_lock:
+        # Another probe may have refreshed the cache while we waited
+        if time.monotonic() - _health_cache["t"] < _HEALTH_CACHE_TTL:
+            return _health_cache["v"]
+        _health_cache["v"] = await health_check()
+        _health_cache["t"] = time.monotonic()
+        return _health_cache["v"]
+
+
 @router.get("/health/ready", status_code=status.HTTP_200_OK)
 async def readiness_check() -> Dict[str, Any]:
     """
@@ -67,7 +99,7 @@ async def readiness_check() -> Dict[str, Any]:
     Returns 200 OK only if all services are healthy.
     Returns 503 if any service is unavailable.
     """
-    health_status = await health_check()
+    health_status = await _cached_health_check()
     
     # Check if all services are healthy
     all_healthy = all(
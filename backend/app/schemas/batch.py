@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+
+
+class BatchRequestItem(BaseModel):
+    """A single sub-request inside a batch."""
+    id: str = Field(..., description="Client-chosen ID echoed back in the response")
+    url: str = Field(..., description="Path (and optional query string) to call")
+    method: str = Field("GET", description="HTTP method")
+    body: Optional[Dict[str, Any]] = Field(None, description="JSON body for POST requests")
+
+
+class BatchRequest(BaseModel):
+    """Request model for executing several API calls in one round trip."""
+    requests: List[BatchRequestItem] = Field(..., min_length=1, max_length=20)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "requests": [
+                    {"id": "list", "url": "/chat/conversations", "method": "GET"},
+                    {
+                        "id": "messages",
+                        "url": "/chat/conversations/550e8400-e29b-41d4-a716-446655440000/messages",
+                        "method": "GET",
+                    },
+                ]
+            }
+        }
+
+
+class BatchResponseItem(BaseModel):
+    """Result of a single sub-request."""
+    id: str
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    """Response model for a batch of API calls."""
+    responses: List[BatchResponseItem]
@@ -27,6 +27,7 @@ class ConversationCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=255, description="Conversation title")
 
     class Config:
+        str_strip_whitespace = True
         json_schema_extra = {
             "example": {
                 "title": "AI Trends Discussion"
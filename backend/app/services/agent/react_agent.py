@@ -1,4 +1,4 @@
-from groq import Groq
+from groq import AsyncGroq
 import logging
 from typing import List, Dict, Any, AsyncGenerator, Optional
 import asyncio
@@ -11,6 +11,33 @@ from app.services.db.supabase_client import supabase_client
 
 logger = logging.getLogger(__name__)
 
+# Marker that opens a tool call in the agent's response format
+ACTION_PREFIX = "ACTION:"
+
+# Patterns for parsing tool calls out of agent responses
+_ACTION_RE = re.compile(r'ACTION:\s*(\w+)', re.IGNORECASE)
+_INPUT_RE = re.compile(r'INPUT:\s*(.+?)(?:\n|$)', re.IGNORECASE | re.DOTALL)
+
+# Fixed status events, built once; consumers only read them
+_LOADING_EVENT = {"event": "loading", "data": {"status": "Agent is thinking..."}}
+_RESPONDING_EVENT = {"event": "responding", "data": {"status": "Generating response..."}}
+_STREAMING_EVENT = {"event": "streaming", "data": {"status": "Streaming response..."}}
+_DONE_EVENT = {"event": "done", "data": {"message_id": "generated"}}
+
+# User-facing names for tool activity events
+_TOOL_DISPLAY_NAMES = {
+    "Tavily_Search": "Web Search",
+    "Google_Trends_MCP": "Google Trends",
+}
+
+
+def _partial_action_len(text: str) -> int:
+    """Length of the longest suffix of text that could begin ACTION_PREFIX."""
+    for n in range(min(len(text), len(ACTION_PREFIX) - 1), 0, -1):
+        if ACTION_PREFIX.startswith(text[-n:].upper()):
+            return n
+    return 0
+
 
 class ReActAgent:
     """ReAct agent using Groq API with tool invocation."""
@@ -22,6 +49,21 @@ class ReActAgent:
         self.groq_api_key = settings.groq_api_key if hasattr(settings, 'groq_api_key') else None
         self.model_name = "llama-3.3-70b-versatile"
         self.temperature = 0.7
+        self.system_prompt = self._create_system_prompt()
+        self._groq_client: Optional[AsyncGroq] = None
+
+    @property
+    def groq_client(self) -> AsyncGroq:
+        """Groq client, created on first use and reused across requests."""
+        if self._groq_client is None:
+            self._groq_client = AsyncGroq(api_key=self.groq_api_key)
+        return self._groq_client
+
+    async def aclose(self) -> None:
+        """Close the Groq client if it was created."""
+        if self._groq_client is not None:
+            await self._groq_client.close()
+            self._groq_client = None
 
     def _create_system_prompt(self) -> str:
         """Create system prompt for the agent."""
@@ -41,17 +83,22 @@ If you don't need tools, just provide your answer directly.
 
 Tool names must be exactly: Tavily_Search or Google_Trends_MCP"""
 
-    def _call_groq(self, messages: List[Dict[str, str]]) -> str:
-        """Call Groq API (synchronous)."""
+    async def _stream_groq(
+        self, messages: List[Dict[str, str]]
+    ) -> AsyncGenerator[str, None]:
+        """Call Groq API and yield response text deltas as they arrive."""
         try:
-            client = Groq(api_key=self.groq_api_key)
-            response = client.chat.completions.create(
+            stream = await self.groq_client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=1024,
+                stream=True,
             )
-            return response.choices[0].message.content
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
         except Exception as e:
             logger.error(f"Groq API error: {str(e)}")
             raise
@@ -59,14 +106,14 @@ Tool names must be exactly: Tavily_Search or Google_Trends_MCP"""
     def _parse_action(self, text: str) -> Optional[Dict[str, str]]:
         """Parse ACTION and INPUT from agent response."""
         # Look for ACTION: tool_name pattern
-        action_match = re.search(r'ACTION:\s*(\w+)', text, re.IGNORECASE)
+        action_match = _ACTION_RE.search(text)
         if not action_match:
             return None
         
         tool_name = action_match.group(1)
         
         # Look for INPUT: ... pattern
-        input_match = re.search(r'INPUT:\s*(.+?)(?:\n|$)', text, re.IGNORECASE | re.DOTALL)
+        input_match = _INPUT_RE.search(text)
         tool_input = input_match.group(1).strip() if input_match else ""
         
         return {
@@ -128,24 +175,19 @@ Tool names must be exactly: Tavily_Search or Google_Trends_MCP"""
         """
         try:
             # Emit loading event immediately
-            yield {
-                "event": "loading",
-                "data": {"status": "Agent is thinking..."},
-            }
+            yield _LOADING_EVENT
             
             # Load conversation history
-            messages_data = supabase_client.get_recent_messages(
-                conversation_id, user_id, limit=10
+            messages_data = await asyncio.to_thread(
+                supabase_client.get_recent_messages,
+                conversation_id,
+                user_id,
+                limit=10,
             )
             
-            # Format history for API
-            messages = [{"role": "system", "content": self._create_system_prompt()}]
-            
-            for msg in messages_data:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
+            # Format history for API (rows are already {"role", "content"})
+            messages = [{"role": "system", "content": self.system_prompt}]
+            messages.extend(messages_data)
             
             # Add current message
             messages.append({"role": "user", "content": user_message})
@@ -155,37 +197,77 @@ Tool names must be exactly: Tavily_Search or Google_Trends_MCP"""
             # ReAct loop
             iteration = 0
             final_response = None
+            streaming_started = False
+            unsent = ""
+            # Everything forwarded to the client; text written before a tool
+            # call is part of the reply the user saw, so it is saved too
+            streamed: List[str] = []
+            loop = asyncio.get_running_loop()
             
             while iteration < self.max_iterations:
                 iteration += 1
-                logger.info(f"ReAct iteration {iteration}/{self.max_iterations}")
+                logger.info("ReAct iteration %d/%d", iteration, self.max_iterations)
                 
                 # Emit responding event
-                yield {
-                    "event": "responding",
-                    "data": {"status": "Generating response..."},
-                }
+                yield _RESPONDING_EVENT
                 
-                # Call Groq API
-                response = await asyncio.wait_for(
-                    asyncio.to_thread(self._call_groq, messages),
-                    timeout=self.timeout,
-                )
+                # Call Groq API, forwarding tokens as they arrive. A tool call
+                # can appear anywhere in the reply, so any tail that could be
+                # the start of ACTION: is held back, and forwarding stops once
+                # the marker shows up. The timeout budget is only spent waiting
+                # on Groq, never while paused for the client to read a token.
+                response_parts = []
+                pending = ""  # text received but not yet forwarded
+                sent = 0  # characters of this response already forwarded
+                has_action = False
+                remaining = self.timeout
+                stream = self._stream_groq(messages)
+                try:
+                    while True:
+                        started = loop.time()
+                        try:
+                            delta = await asyncio.wait_for(anext(stream), remaining)
+                        except StopAsyncIteration:
+                            break
+                        remaining -= loop.time() - started
+                        response_parts.append(delta)
+                        if has_action:
+                            continue
+                        
+                        pending += delta
+                        if ACTION_PREFIX in pending.upper():
+                            has_action = True
+                            continue
+                        
+                        held = _partial_action_len(pending)
+                        ready = pending[:len(pending) - held]
+                        if ready:
+                            if not streaming_started:
+                                streaming_started = True
+                                yield _STREAMING_EVENT
+                            streamed.append(ready)
+                            yield {"event": "token", "data": {"token": ready}}
+                            pending = pending[len(ready):]
+                            sent += len(ready)
+                finally:
+                    await stream.aclose()
                 
-                logger.info(f"Agent response (iteration {iteration}): {response[:100]}...")
+                response = "".join(response_parts)
+                
+                logger.info("Agent response (iteration %d): %.100s...", iteration, response)
                 
                 # Check if response contains tool action
-                action = self._parse_action(response)
+                action = self._parse_action(response) if has_action else None
                 
                 if action:
                     # Tool invocation detected
                     tool_name = action["tool"]
                     tool_input = action["input"]
                     
-                    logger.info(f"Tool action detected: {tool_name}")
+                    logger.info("Tool action detected: %s", tool_name)
                     
                     # Emit tool selected event (shows which tool was chosen)
-                    tool_display_name = "Web Search" if tool_name == "Tavily_Search" else "Google Trends"
+                    tool_display_name = _TOOL_DISPLAY_NAMES.get(tool_name, "Google Trends")
                     yield {
                         "event": "tool_selected",
                         "data": {
@@ -207,7 +289,7 @@ Tool names must be exactly: Tavily_Search or Google_Trends_MCP"""
                     # Invoke tool
                     tool_result = await self._invoke_tool(tool_name, tool_input)
                     
-                    logger.info(f"Tool result: {tool_result[:100]}...")
+                    logger.info("Tool result: %.100s...", tool_result)
                     
                     # Emit tool completion event
                     yield {
@@ -231,40 +313,37 @@ Tool names must be exactly: Tavily_Search or Google_Trends_MCP"""
                 else:
                     # No tool action, this is the final response
                     final_response = response
-                    logger.info(f"Final response generated at iteration {iteration}")
+                    unsent = response[sent:]
+                    logger.info("Final response generated at iteration %d", iteration)
                     break
             
             # If we hit max iterations without final response, use last response
             if final_response is None:
                 final_response = response
-                logger.warning(f"Max iterations reached, using last response")
+                unsent = response[sent:]
+                logger.warning("Max iterations reached, using last response")
             
-            # Emit streaming event
-            yield {
-                "event": "streaming",
-                "data": {"status": "Streaming response..."},
-            }
-            
-            # Stream response tokens
-            for token in final_response.split():
+            # Send whatever part of the final response was not streamed live
+            if unsent:
+                if not streaming_started:
+                    yield _STREAMING_EVENT
+                streamed.append(unsent)
                 yield {
                     "event": "token",
-                    "data": {"token": token + " "},
+                    "data": {"token": unsent},
                 }
             
-            # Save agent response
-            supabase_client.save_message(
+            # Save agent response (in a thread: the write may back off on rate limits)
+            await asyncio.to_thread(
+                supabase_client.save_message,
                 conversation_id=conversation_id,
                 user_id=user_id,
                 role="assistant",
-                content=final_response,
+                content="".join(streamed),
             )
             
             # Emit done event
-            yield {
-                "event": "done",
-                "data": {"message_id": "generated"},
-            }
+            yield _DONE_EVENT
             
         except asyncio.TimeoutError:
             logger.error(f"Agent processing timed out after {self.timeout}s")
@@ -1,10 +1,46 @@
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
 from app.core.config import settings
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+import httpx
 import logging
-from typing import Optional, List, Dict, Any
+import threading
+import time
+import uuid
+from typing import Optional, List, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Conversation ownership cache settings
+_CONVERSATION_CACHE_TTL = 60.0
+_CONVERSATION_CACHE_SIZE = 10_000
+
+# Postgres "invalid_text_representation", e.g. a malformed UUID
+_INVALID_TEXT_REPRESENTATION = "22P02"
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Whether a Supabase write failed transiently (rate limit or network)."""
+    if isinstance(error, (httpx.TransportError, httpx.TimeoutException)):
+        return True
+    if str(getattr(error, "code", "")) == "429":
+        return True
+    return "too many requests" in str(error).lower()
+
+
+# Shared policy for Supabase writes that are safe to repeat
+_retry_transient = retry(
+    wait=wait_exponential_jitter(initial=1, max=10),
+    stop=stop_after_attempt(4),
+    retry=retry_if_exception(_is_retryable),
+    reraise=True,
+)
+
 
 class SupabaseClient:
     """Wrapper for Supabase client operations."""
@@ -16,6 +52,65 @@ class SupabaseClient:
             settings.supabase_url,
             settings.supabase_key,  # This should be the service role key
         )
+        # (conversation_id, user_id) -> (expires_at, conversation)
+        self._conversation_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        # Lookups run in worker threads, so cache access is serialized
+        self._conversation_cache_lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        """Open the HTTP connection to Supabase before the first request."""
+        try:
+            self.client.table("conversations").select("id").limit(1).execute()
+            logger.info("Supabase connection warmed up")
+        except Exception as e:
+            logger.warning(f"Supabase warm-up failed: {str(e)}")
+
+    def _cache_conversation(self, conversation: Dict[str, Any]) -> None:
+        """Remember that a conversation belongs to its user for a short TTL."""
+        key = (conversation["id"], conversation["user_id"])
+        with self._conversation_cache_lock:
+            if len(self._conversation_cache) >= _CONVERSATION_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._conversation_cache.pop(next(iter(self._conversation_cache)), None)
+            self._conversation_cache[key] = (
+                time.monotonic() + _CONVERSATION_CACHE_TTL,
+                conversation,
+            )
+
+    @_retry_transient
+    def _insert_idempotent(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Insert a row with a client-generated id, retrying transient failures.
+        
+        The id is fixed before the first attempt and conflicts are ignored, so
+        a retry after a write that actually succeeded never inserts twice.
+        """
+        response = self.client.table(table).upsert(
+            row, ignore_duplicates=True
+        ).execute()
+        if response.data:
+            return response.data[0]
+        # An earlier attempt already inserted this row
+        response = self.client.table(table).select("*").eq("id", row["id"]).execute()
+        return response.data[0]
+
+    @_retry_transient
+    def _insert_user_message(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Call insert_user_message_if_owner, retrying transient failures.
+        
+        Like _insert_idempotent, the message id (`p_id`) is fixed before the
+        first attempt and the function ignores conflicts on it.
+        """
+        response = self.client.rpc("insert_user_message_if_owner", params).execute()
+        if response.data:
+            return response.data[0]
+        # Either the conversation is not owned, or an earlier attempt
+        # already inserted this message
+        response = self.client.table("messages").select("*").eq(
+            "id", params["p_id"]
+        ).execute()
+        return response.data[0] if response.data else None
 
     def create_user(self, email: str, password: str) -> Dict[str, Any]:
         """Create a new user in Supabase Auth."""
@@ -89,12 +184,14 @@ class SupabaseClient:
     ) -> Dict[str, Any]:
         """Create a new conversation."""
         try:
-            response = self.client.table("conversations").insert({
+            conversation = self._insert_idempotent("conversations", {
+                "id": str(uuid.uuid4()),
                 "user_id": user_id,
                 "title": title,
-            }).execute()
-            logger.info(f"Conversation created: {response.data[0]['id']}")
-            return response.data[0]
+            })
+            logger.info(f"Conversation created: {conversation['id']}")
+            self._cache_conversation(conversation)
+            return conversation
         except Exception as e:
             logger.error(f"Error creating conversation: {str(e)}")
             raise
@@ -113,12 +210,24 @@ class SupabaseClient:
     def get_conversation(
         self, conversation_id: str, user_id: str
     ) -> Optional[Dict[str, Any]]:
-        """Get a specific conversation."""
+        """Get a specific conversation (ownership checks are cached briefly)."""
+        key = (conversation_id, user_id)
+        with self._conversation_cache_lock:
+            cached = self._conversation_cache.get(key)
+            if cached:
+                expires_at, conversation = cached
+                if expires_at > time.monotonic():
+                    return conversation
+                self._conversation_cache.pop(key, None)
+        
         try:
             response = self.client.table("conversations").select("*").eq(
                 "id", conversation_id
             ).eq("user_id", user_id).execute()
-            return response.data[0] if response.data else None
+            if not response.data:
+                return None
+            self._cache_conversation(response.data[0])
+            return response.data[0]
         except Exception as e:
             logger.error(f"Error getting conversation: {str(e)}")
             return None
@@ -130,21 +239,57 @@ class SupabaseClient:
         role: str,
         content: str,
         tool_calls: Optional[Dict[str, Any]] = None,
+        message_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Save a message to the database."""
+        """
+        Save a message to the database.
+        
+        `message_id` acts as an idempotency key; one is generated if omitted.
+        """
         try:
-            response = self.client.table("messages").insert({
+            message = self._insert_idempotent("messages", {
+                "id": message_id or str(uuid.uuid4()),
                 "conversation_id": conversation_id,
                 "user_id": user_id,
                 "role": role,
                 "content": content,
                 "tool_calls": tool_calls,
-            }).execute()
-            logger.info(f"Message saved: {response.data[0]['id']}")
-            return response.data[0]
+            })
+            logger.info(f"Message saved: {message['id']}")
+            return message
+        except Exception as e:
+            logger.error(f"Error saving message: {str(e)}")
+            raise
+
+    def save_user_message_if_owner(
+        self, conversation_id: str, user_id: str, content: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Save a user message only if the user owns the conversation.
+        
+        Runs the ownership check and insert as one RPC round-trip, retried
+        with backoff on rate limits. Returns the saved message, or None if
+        the conversation is not found or not owned by the user. Any other
+        failure is raised.
+        """
+        try:
+            message = self._insert_user_message({
+                "p_id": str(uuid.uuid4()),
+                "p_conversation_id": conversation_id,
+                "p_user_id": user_id,
+                "p_content": content,
+            })
         except Exception as e:
+            # A malformed conversation id can't match any conversation
+            if isinstance(e, APIError) and e.code == _INVALID_TEXT_REPRESENTATION:
+                return None
             logger.error(f"Error saving message: {str(e)}")
             raise
+        
+        if not message:
+            return None
+        logger.info(f"Message saved: {message['id']}")
+        return message
 
     def get_messages(
         self, conversation_id: str, user_id: str, limit: int = 50
@@ -164,9 +309,14 @@ class SupabaseClient:
     def get_recent_messages(
         self, conversation_id: str, user_id: str, limit: int = 10
     ) -> List[Dict[str, Any]]:
-        """Get recent messages for a conversation (for agent context)."""
+        """
+        Get recent messages for a conversation (for agent context).
+        
+        Only `role` and `content` are selected, so each row is already in the
+        chat-completion message shape.
+        """
         try:
-            response = self.client.table("messages").select("*").eq(
+            response = self.client.table("messages").select("role, content").eq(
                 "conversation_id", conversation_id
             ).eq("user_id", user_id).order(
                 "created_at", desc=True
@@ -0,0 +1,26 @@
+import httpx
+from typing import Optional
+
+# Shared HTTP client: one keep-alive connection pool for all outbound calls
+# (Tavily, Supabase JWKS, MCP health checks). Opened and closed by the app
+# lifespan, so each lifespan gets a fresh pool.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it if none is open."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30.0,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared client if one is open."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
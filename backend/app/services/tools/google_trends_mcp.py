@@ -1,16 +1,63 @@
+import asyncio
 import logging
-from typing import Dict, Any
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
 from pytrends.request import TrendReq
 
 logger = logging.getLogger(__name__)
 
+# Trends change slowly, so successful lookups are reused for a few minutes
+_TRENDS_CACHE_TTL = 300.0
+_TRENDS_CACHE_SIZE = 1024
+
+# (connect, read) timeouts for pytrends requests, so a stalled Google
+# endpoint can't hold a worker thread and the agent loop for long
+_PYTRENDS_TIMEOUT = (3.05, 8)
+
 
 class GoogleTrendsMCPTool:
     """Wrapper for Google Trends data using pytrends."""
 
     def __init__(self):
         """Initialize Google Trends tool."""
-        self.pytrends = TrendReq(hl='en-US', tz=360)
+        self.pytrends = TrendReq(hl='en-US', tz=360, timeout=_PYTRENDS_TIMEOUT)
+        # build_payload stores the query on the TrendReq, so keyword lookups
+        # running in worker threads take turns on the shared instance
+        self._payload_lock = threading.Lock()
+        # (kind, *args) -> (expires_at, result)
+        self._cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+        # Fetches currently running, shared by concurrent callers with the same key
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+
+    def _cache_get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Return a cached result if it hasn't expired."""
+        cached = self._cache.get(key)
+        if cached:
+            expires_at, result = cached
+            if expires_at > time.monotonic():
+                return result
+            self._cache.pop(key, None)
+        return None
+
+    def _cache_put(self, key: Tuple, result: Dict[str, Any]) -> None:
+        """Cache a successful result for the TTL."""
+        if len(self._cache) >= _TRENDS_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (time.monotonic() + _TRENDS_CACHE_TTL, result)
+
+    async def _coalesce(
+        self, key: Tuple, fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run fetch once for concurrent callers with the same key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller disconnecting doesn't cancel the others' fetch
+        return await asyncio.shield(task)
 
     async def get_trending_terms(self, geo: str = "US") -> Dict[str, Any]:
         """
@@ -22,26 +69,34 @@ class GoogleTrendsMCPTool:
         Returns:
             Dictionary with trending terms
         """
+        cache_key = ("trending", geo)
+        cached = self._cache_get(cache_key)
+        if cached:
+            logger.info(f"Trending terms for geo={geo} served from cache")
+            return cached
+        
+        return await self._coalesce(
+            cache_key, lambda: self._fetch_trending_terms(geo, cache_key)
+        )
+
+    async def _fetch_trending_terms(self, geo: str, cache_key: Tuple) -> Dict[str, Any]:
+        """Fetch trending terms and cache a successful result."""
         try:
             logger.info(f"Fetching trending terms for geo={geo}")
             
-            # Get trending searches for the specified region
-            trending_searches = self.pytrends.trending_searches(pn=geo)
-            
-            # Convert to list of dictionaries
-            trends = [
-                {"keyword": keyword, "rank": idx + 1}
-                for idx, keyword in enumerate(trending_searches[0].values)
-            ]
+            # Get trending searches for the specified region; the fetch and
+            # the DataFrame conversion both run off the event loop
+            trends = await asyncio.to_thread(self._trending_terms, geo)
             
             logger.info(f"Trending terms fetched successfully: {len(trends)} trends")
             
-            return {
+            result = {
                 "success": True,
                 "geo": geo,
                 "trends": trends,
-                "raw_response": trending_searches,
             }
+            self._cache_put(cache_key, result)
+            return result
         except Exception as e:
             error_msg = str(e)
             logger.error(f"Trends error: {error_msg}")
@@ -62,12 +117,28 @@ class GoogleTrendsMCPTool:
         Returns:
             Dictionary with news articles
         """
+        cache_key = ("news", keyword, max_results)
+        cached = self._cache_get(cache_key)
+        if cached:
+            logger.info(f"News for keyword={keyword} served from cache")
+            return cached
+        
+        return await self._coalesce(
+            cache_key,
+            lambda: self._fetch_news_by_keyword(keyword, max_results, cache_key),
+        )
+
+    async def _fetch_news_by_keyword(
+        self, keyword: str, max_results: int, cache_key: Tuple
+    ) -> Dict[str, Any]:
+        """Fetch related-query news for a keyword and cache a successful result."""
         try:
             logger.info(f"Fetching news for keyword={keyword}")
             
             # Get related queries for the keyword
-            self.pytrends.build_payload([keyword], timeframe='today 1m')
-            related_queries = self.pytrends.related_queries()
+            related_queries = await asyncio.to_thread(
+                self._related_queries, keyword
+            )
             
             # Extract top queries
             top_queries = related_queries.get(keyword, {}).get('top', [])
@@ -83,12 +154,13 @@ class GoogleTrendsMCPTool:
             
             logger.info(f"News fetched successfully")
             
-            return {
+            result = {
                 "success": True,
                 "keyword": keyword,
                 "articles": articles,
-                "raw_response": related_queries,
             }
+            self._cache_put(cache_key, result)
+            return result
         except Exception as e:
             error_msg = str(e)
             logger.error(f"News error: {error_msg}")
@@ -99,6 +171,20 @@ class GoogleTrendsMCPTool:
                 "articles": [],
             }
 
+    def _trending_terms(self, geo: str) -> List[Dict[str, Any]]:
+        """Fetch trending searches and convert them to ranked dicts (blocking)."""
+        trending_searches = self.pytrends.trending_searches(pn=geo)
+        return [
+            {"keyword": keyword, "rank": idx + 1}
+            for idx, keyword in enumerate(trending_searches[0].values)
+        ]
+
+    def _related_queries(self, keyword: str) -> Dict[str, Any]:
+        """Build the payload and fetch related queries (blocking)."""
+        with self._payload_lock:
+            self.pytrends.build_payload([keyword], timeframe='today 1m')
+            return self.pytrends.related_queries()
+
     def format_trends(self, trends_result: Dict[str, Any]) -> str:
         """
         Format trending terms for agent consumption.
@@ -112,20 +198,20 @@ class GoogleTrendsMCPTool:
         if not trends_result["success"]:
             return f"Trends fetch failed: {trends_result['error']}"
         
-        formatted = f"Google Trends ({trends_result['geo']}):\n\n"
+        parts = [f"Google Trends ({trends_result['geo']}):\n\n"]
         
         if trends_result["trends"]:
             for i, trend in enumerate(trends_result["trends"][:10], 1):
                 if isinstance(trend, dict):
                     keyword = trend.get("keyword", "No keyword")
                     rank = trend.get("rank", "N/A")
-                    formatted += f"{i}. {keyword} (Rank: {rank})\n"
+                    parts.append(f"{i}. {keyword} (Rank: {rank})\n")
                 else:
-                    formatted += f"{i}. {trend}\n"
+                    parts.append(f"{i}. {trend}\n")
         else:
-            formatted += "No trends data available."
+            parts.append("No trends data available.")
         
-        return formatted
+        return "".join(parts)
 
     def format_news(self, news_result: Dict[str, Any]) -> str:
         """
@@ -140,7 +226,7 @@ class GoogleTrendsMCPTool:
         if not news_result["success"]:
             return f"News fetch failed: {news_result['error']}"
         
-        formatted = f"News Articles for '{news_result['keyword']}':\n\n"
+        parts = [f"News Articles for '{news_result['keyword']}':\n\n"]
         
         if news_result["articles"]:
             for i, article in enumerate(news_result["articles"][:5], 1):
@@ -148,18 +234,18 @@ class GoogleTrendsMCPTool:
                     title = article.get("title", "No title")
                     url = article.get("url", "")
                     summary = article.get("summary", "")
-                    formatted += f"{i}. {title}\n"
+                    parts.append(f"{i}. {title}\n")
                     if summary:
-                        formatted += f"   {summary}\n"
+                        parts.append(f"   {summary}\n")
                     if url:
-                        formatted += f"   URL: {url}\n"
-                    formatted += "\n"
+                        parts.append(f"   URL: {url}\n")
+                    parts.append("\n")
                 else:
-                    formatted += f"{i}. {article}\n"
+                    parts.append(f"{i}. {article}\n")
         else:
-            formatted += "No articles found."
+            parts.append("No articles found.")
         
-        return formatted
+        return "".join(parts)
 
     async def health_check(self) -> bool:
         """
@@ -171,7 +257,7 @@ class GoogleTrendsMCPTool:
         try:
             logger.info("Google Trends tool health check")
             # Try to fetch trending searches to verify connectivity
-            self.pytrends.trending_searches(pn='US')
+            await asyncio.to_thread(self.pytrends.trending_searches, pn='US')
             return True
         except Exception as e:
             logger.warning(f"Health check failed: {str(e)}")
@@ -1,17 +1,24 @@
-from tavily import TavilyClient
 from app.core.config import settings
+from app.services.http_client import get_http_client
 import logging
 from typing import Dict, Any, List, Optional
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Tavily REST search endpoint
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Per-search timeout in seconds (tighter than the shared client's default)
+TAVILY_TIMEOUT = 10.0
+
 
 class TavilySearchTool:
     """Wrapper for Tavily web search API."""
 
     def __init__(self):
         """Initialize Tavily client."""
-        self.client = TavilyClient(api_key=settings.tavily_api_key)
+        self.api_key = settings.tavily_api_key
 
     async def search(
         self,
@@ -33,11 +40,19 @@ class TavilySearchTool:
         try:
             logger.info(f"Tavily search: {query}")
             
-            response = self.client.search(
-                query=query,
-                max_results=max_results,
-                include_answer=include_answer,
+            http_response = await get_http_client().post(
+                TAVILY_SEARCH_URL,
+                json={
+                    "api_key": self.api_key,
+                    "query": query,
+                    "max_results": max_results,
+                    "include_answer": include_answer,
+                },
+                timeout=TAVILY_TIMEOUT,
             )
+            http_response.raise_for_status()
+            # Parse the raw bytes directly instead of decoding to str first
+            response = orjson.loads(http_response.content)
             
             logger.info(f"Tavily search completed: {len(response.get('results', []))} results")
             
@@ -46,7 +61,6 @@ class TavilySearchTool:
                 "query": query,
                 "results": response.get("results", []),
                 "answer": response.get("answer", ""),
-                "raw_response": response,
             }
         except Exception as e:
             error_msg = str(e)
@@ -97,21 +111,23 @@ class TavilySearchTool:
         if not search_result["success"]:
             return f"Search failed: {search_result['error']}"
         
-        formatted = f"Search Results for '{search_result['query']}':\n\n"
+        parts = [f"Search Results for '{search_result['query']}':\n\n"]
         
         if search_result["answer"]:
-            formatted += f"Answer: {search_result['answer']}\n\n"
+            parts.append(f"Answer: {search_result['answer']}\n\n")
         
         if search_result["results"]:
-            formatted += "Top Results:\n"
+            parts.append("Top Results:\n")
             for i, result in enumerate(search_result["results"], 1):
-                formatted += f"\n{i}. {result.get('title', 'No title')}\n"
-                formatted += f"   URL: {result.get('url', 'No URL')}\n"
-                formatted += f"   {result.get('content', 'No content')}\n"
+                parts.append(
+                    f"\n{i}. {result.get('title', 'No title')}\n"
+                    f"   URL: {result.get('url', 'No URL')}\n"
+                    f"   {result.get('content', 'No content')}\n"
+                )
         else:
-            formatted += "No results found."
+            parts.append("No results found.")
         
-        return formatted
+        return "".join(parts)
 
 
 # Global instance
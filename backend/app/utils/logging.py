@@ -10,6 +10,13 @@ SENSITIVE_KEYS = {
     'supabase_key', 'tavily_api_key', 'jwt_secret'
 }
 
+# Redaction patterns, compiled once since the filter runs on every record
+_SECRET_ASSIGNMENT_RE = re.compile(
+    r'(api[_-]?key|token|password|secret)\s*[:=]\s*[^\s,}]+',
+    re.IGNORECASE
+)
+_BEARER_TOKEN_RE = re.compile(r'Bearer\s+[^\s]+', re.IGNORECASE)
+
 
 class SensitiveDataFilter(logging.Filter):
     """Filter to redact sensitive data from logs."""
@@ -33,19 +40,9 @@ class SensitiveDataFilter(logging.Filter):
     def _redact_string(text: str) -> str:
         """Redact sensitive patterns from string."""
         # Redact API keys
-        text = re.sub(
-            r'(api[_-]?key|token|password|secret)\s*[:=]\s*[^\s,}]+',
-            r'\1=***REDACTED***',
-            text,
-            flags=re.IGNORECASE
-        )
+        text = _SECRET_ASSIGNMENT_RE.sub(r'\1=***REDACTED***', text)
         # Redact Bearer tokens
-        text = re.sub(
-            r'Bearer\s+[^\s]+',
-            'Bearer ***REDACTED***',
-            text,
-            flags=re.IGNORECASE
-        )
+        text = _BEARER_TOKEN_RE.sub('Bearer ***REDACTED***', text)
         return text
 
     @staticmethod
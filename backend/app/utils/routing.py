@@ -0,0 +1,32 @@
+from fastapi import Request
+from fastapi.routing import APIRoute
+from typing import Any, Callable, Coroutine
+from starlette.responses import Response
+import orjson
+
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is decoded with orjson instead of stdlib json."""
+
+    async def json(self) -> Any:
+        """Decode and cache the request body."""
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so
+            # FastAPI still maps malformed bodies to a 422 response
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """Route class that hands handlers an ORJSONRequest for body parsing."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """Wrap the default handler so request bodies are parsed with orjson."""
+        original_route_handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request) -> Response:
+            return await original_route_handler(
+                ORJSONRequest(request.scope, request.receive)
+            )
+
+        return orjson_route_handler
@@ -0,0 +1,50 @@
+"""
+Shared pytest fixtures for the backend integration tests.
+"""
+import asyncio
+from collections import defaultdict
+
+import httpx
+import orjson
+import pytest
+
+# Backend API base URL
+BASE_URL = "http://localhost:8000"
+
+
+def rjson(response: httpx.Response):
+    """Decode a JSON response body with orjson instead of httpx's stdlib decoder."""
+    return orjson.loads(response.content)
+
+
+def group_by_role(messages):
+    """Bucket a list of message dicts by their role in a single pass."""
+    out = defaultdict(list)
+    for m in messages:
+        out[m.get("role")].append(m)
+    return out
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _event_loop_policy():
+    """Use the default asyncio event loop policy for the whole session."""
+    asyncio.set_event_loop_policy(asyncio.DefaultEventLoopPolicy())
+
+
+@pytest.fixture(scope="session")
+def event_loop(_event_loop_policy):
+    """Session-wide event loop so session-scoped async fixtures can share it."""
+    loop = asyncio.get_event_loop_policy().new_event_loop()
+    yield loop
+    # Closed only after every async fixture (including http_client) is torn down
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+async def http_client():
+    """HTTP client whose connection pool is shared by the whole test session."""
+    client = httpx.AsyncClient(base_url=BASE_URL, timeout=60.0)
+    try:
+        yield client
+    finally:
+        await client.aclose()
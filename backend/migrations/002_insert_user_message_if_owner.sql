@@ -0,0 +1,32 @@
+-- Insert a user message only if the conversation belongs to that user.
+-- Combines the ownership check and the insert into a single round-trip and
+-- removes the race between checking and inserting.
+-- p_id is generated by the client and conflicts are ignored, so a retried
+-- call never inserts the message twice.
+-- Returns the inserted row, or no rows if the conversation is not owned or
+-- the message already exists.
+
+-- Replaces the earlier version without p_id
+DROP FUNCTION IF EXISTS insert_user_message_if_owner(UUID, UUID, TEXT);
+
+CREATE OR REPLACE FUNCTION insert_user_message_if_owner(
+  p_id UUID,
+  p_conversation_id UUID,
+  p_user_id UUID,
+  p_content TEXT
+)
+RETURNS SETOF messages
+LANGUAGE sql
+AS $$
+  INSERT INTO messages (id, conversation_id, user_id, role, content)
+  SELECT p_id, p_conversation_id, p_user_id, 'user', p_content
+  WHERE EXISTS (
+    SELECT 1 FROM conversations
+    WHERE id = p_conversation_id AND user_id = p_user_id
+  )
+  ON CONFLICT (id) DO NOTHING
+  RETURNING *;
+$$;
+
+-- Grant permissions
+GRANT EXECUTE ON FUNCTION insert_user_message_if_owner(UUID, UUID, UUID, TEXT) TO authenticated;
@@ -0,0 +1,123 @@
+"""
+Tests for tool-call detection in the streaming ReAct loop.
+Groq, the tools and Supabase are stubbed; only the loop logic runs.
+"""
+import asyncio
+import os
+from unittest import mock
+
+import pytest
+from pytrends.request import TrendReq
+
+# Importing the agent builds the app's module-level clients: settings need
+# the Supabase/Tavily variables, create_client() only accepts a JWT-shaped
+# key and TrendReq() fetches a cookie from Google. Fill in placeholders and
+# skip the cookie request so the tests run offline.
+_PLACEHOLDER_ENV = {
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_KEY": "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.test",
+    "SUPABASE_JWT_SECRET": "test-secret",
+    "TAVILY_API_KEY": "test-key",
+}
+for _name, _value in _PLACEHOLDER_ENV.items():
+    os.environ.setdefault(_name, _value)
+
+with mock.patch.object(TrendReq, "GetGoogleCookie", return_value={}):
+    from app.services.agent import react_agent as agent_module
+    from app.services.agent.react_agent import react_agent
+
+
+async def _run(monkeypatch, *replies, read_delay=0.0):
+    """Run process_message against scripted model replies (one list of chunks per call)."""
+    scripted = iter(replies)
+    invoked = []
+    saved = []
+
+    async def fake_stream(messages):
+        for chunk in next(scripted):
+            yield chunk
+
+    async def fake_invoke(tool_name, tool_input):
+        invoked.append((tool_name, tool_input))
+        return "tool result"
+
+    monkeypatch.setattr(react_agent, "_stream_groq", fake_stream)
+    monkeypatch.setattr(react_agent, "_invoke_tool", fake_invoke)
+    monkeypatch.setattr(agent_module.supabase_client, "get_recent_messages", lambda *a, **k: [])
+    monkeypatch.setattr(agent_module.supabase_client, "save_message", lambda **k: saved.append(k["content"]))
+
+    events = []
+    async for event in react_agent.process_message("hi", "conv-1", "user-1"):
+        events.append(event)
+        if read_delay:
+            await asyncio.sleep(read_delay)
+    tokens = "".join(e["data"]["token"] for e in events if e["event"] == "token")
+    return events, tokens, invoked, saved
+
+
+@pytest.mark.asyncio
+async def test_plain_answer_is_streamed(monkeypatch):
+    """A reply without a tool call is forwarded as tokens."""
+    events, tokens, invoked, saved = await _run(monkeypatch, ["Hello", " world"])
+
+    assert tokens == "Hello world"
+    assert saved == [tokens]
+    assert invoked == []
+    assert events[-1]["event"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_tool_call_after_preamble_is_executed(monkeypatch):
+    """ACTION: after some text still runs the tool instead of ending the turn."""
+    events, tokens, invoked, saved = await _run(
+        monkeypatch,
+        ["Let me look that up.\nACT", "ION: Tavily_Search\nINPUT: ai news\n"],
+        ["Here is ", "the answer."],
+    )
+
+    assert invoked == [("Tavily_Search", "ai news")]
+    assert tokens == "Let me look that up.\nHere is the answer."
+    # A reload shows the same text the client saw live
+    assert saved == [tokens]
+    assert any(e["event"] == "tool_activity" for e in events)
+
+
+@pytest.mark.asyncio
+async def test_held_back_tail_is_flushed(monkeypatch):
+    """Text that only looked like the start of ACTION: is sent at the end."""
+    _, tokens, invoked, saved = await _run(monkeypatch, ["Reply ends with AC"])
+
+    assert tokens == "Reply ends with AC"
+    assert saved == [tokens]
+    assert invoked == []
+
+
+@pytest.mark.asyncio
+async def test_slow_reader_does_not_time_out(monkeypatch):
+    """The agent timeout covers waiting on Groq, not a client reading slowly."""
+    monkeypatch.setattr(react_agent, "timeout", 0.05)
+    events, tokens, _, saved = await _run(
+        monkeypatch, ["one ", "two ", "three"], read_delay=0.03
+    )
+
+    assert tokens == "one two three"
+    assert saved == [tokens]
+    assert events[-1]["event"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_stalled_model_reports_timeout(monkeypatch):
+    """A Groq stream that stops producing deltas ends with an error event."""
+    monkeypatch.setattr(react_agent, "timeout", 0.05)
+
+    async def stalled_stream(messages):
+        yield "partial "
+        await asyncio.sleep(1)
+        yield "never sent"
+
+    monkeypatch.setattr(react_agent, "_stream_groq", stalled_stream)
+    monkeypatch.setattr(agent_module.supabase_client, "get_recent_messages", lambda *a, **k: [])
+
+    events = [e async for e in react_agent.process_message("hi", "conv-1", "user-1")]
+
+    assert events[-1] == {"event": "error", "data": {"error": "Request timed out"}}
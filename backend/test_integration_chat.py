@@ -3,11 +3,13 @@ Integration tests for end-to-end chat flow.
 Tests: sending message → agent response → message saved → chat history restoration
 """
 import pytest
-import httpx
 import asyncio
 import json
+import orjson
 from typing import Dict, Any
 
+from conftest import group_by_role, rjson
+
 # Backend API base URL
 BASE_URL = "http://localhost:8000"
 
@@ -15,15 +17,17 @@ BASE_URL = "http://localhost:8000"
 TEST_EMAIL = "chat_integration_test@example.com"
 TEST_PASSWORD = "TestPassword123!"
 
+# Headers for requests whose body is pre-encoded with orjson
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class TestChatFlow:
     """Test end-to-end chat flow."""
 
     @pytest.fixture
-    async def client(self):
-        """Create HTTP client for testing."""
-        async with httpx.AsyncClient(base_url=BASE_URL, timeout=60.0) as client:
-            yield client
+    def client(self, http_client):
+        """Reuse the session-wide HTTP client."""
+        return http_client
 
     @pytest.fixture
     async def authenticated_client(self, client):
@@ -37,11 +41,14 @@ class TestChatFlow:
             },
         )
         assert response.status_code == 201
-        token = response.json()["access_token"]
+        token = rjson(response)["access_token"]
         
         # Add token to client headers
         client.headers.update({"Authorization": f"Bearer {token}"})
         yield client
+        
+        # The client is shared across the session, so drop this user's token
+        client.headers.pop("Authorization", None)
 
     @pytest.mark.asyncio
     async def test_create_conversation(self, authenticated_client):
@@ -52,7 +59,7 @@ class TestChatFlow:
         )
         
         assert response.status_code == 200, f"Create conversation failed: {response.text}"
-        data = response.json()
+        data = rjson(response)
         
         assert "id" in data, "No conversation ID in response"
         assert data["title"] == "Test Conversation", "Title mismatch"
@@ -72,7 +79,7 @@ class TestChatFlow:
         response = await authenticated_client.get("/chat/conversations")
         
         assert response.status_code == 200, f"List conversations failed: {response.text}"
-        data = response.json()
+        data = rjson(response)
         
         assert "conversations" in data, "No conversations in response"
         assert "count" in data, "No count in response"
@@ -87,7 +94,7 @@ class TestChatFlow:
             json={"title": "Test Conversation"},
         )
         assert create_response.status_code == 200
-        conversation_id = create_response.json()["id"]
+        conversation_id = rjson(create_response)["id"]
         
         # Get messages
         response = await authenticated_client.get(
@@ -95,12 +102,43 @@ class TestChatFlow:
         )
         
         assert response.status_code == 200, f"Get messages failed: {response.text}"
-        data = response.json()
+        data = rjson(response)
         
         assert "messages" in data, "No messages in response"
         assert "count" in data, "No count in response"
         assert data["conversation_id"] == conversation_id, "Conversation ID mismatch"
 
+    @pytest.mark.asyncio
+    async def test_batch_conversations_and_messages(self, authenticated_client):
+        """Test fetching conversations and messages in one batch request."""
+        create_response = await authenticated_client.post(
+            "/chat/conversations",
+            json={"title": "Test Conversation"},
+        )
+        assert create_response.status_code == 200
+        conversation_id = rjson(create_response)["id"]
+
+        response = await authenticated_client.post(
+            "/batch",
+            json={
+                "requests": [
+                    {"id": "list", "url": "/chat/conversations"},
+                    {"id": "messages", "url": f"/chat/conversations/{conversation_id}/messages"},
+                    {"id": "stream", "url": "/chat/message", "method": "POST"},
+                ]
+            },
+        )
+
+        assert response.status_code == 200, f"Batch failed: {response.text}"
+        results = {r["id"]: r for r in rjson(response)["responses"]}
+
+        assert results["list"]["status"] == 200
+        assert results["list"]["body"]["count"] >= 1
+        assert results["messages"]["status"] == 200
+        assert results["messages"]["body"]["conversation_id"] == conversation_id
+        # SSE endpoints can't be batched
+        assert results["stream"]["status"] == 400
+
     @pytest.mark.asyncio
     async def test_send_message_and_receive_response(self, authenticated_client):
         """Test sending a message and receiving agent response via SSE."""
@@ -110,7 +148,7 @@ class TestChatFlow:
             json={"title": "Test Conversation"},
         )
         assert create_response.status_code == 200
-        conversation_id = create_response.json()["id"]
+        conversation_id = rjson(create_response)["id"]
         
         # Send a message
         response = await authenticated_client.post(
@@ -142,7 +180,7 @@ class TestChatFlow:
             json={"title": "Test Conversation"},
         )
         assert create_response.status_code == 200
-        conversation_id = create_response.json()["id"]
+        conversation_id = rjson(create_response)["id"]
         
         # Send a message
         message_content = "Test message for database"
@@ -160,10 +198,10 @@ class TestChatFlow:
             f"/chat/conversations/{conversation_id}/messages"
         )
         assert messages_response.status_code == 200
-        messages = messages_response.json()["messages"]
+        messages = rjson(messages_response)["messages"]
         
         # Find the sent message
-        user_messages = [m for m in messages if m.get("role") == "user"]
+        user_messages = group_by_role(messages)["user"]
         assert len(user_messages) > 0, "User message not found in database"
         assert user_messages[0]["content"] == message_content, "Message content mismatch"
 
@@ -176,17 +214,18 @@ class TestChatFlow:
             json={"title": "History Test"},
         )
         assert create_response.status_code == 200
-        conversation_id = create_response.json()["id"]
+        conversation_id = rjson(create_response)["id"]
         
-        # Send multiple messages
+        # Send multiple messages, serializing the shared envelope only once.
+        # Sent one at a time: each runs the agent on this conversation, so
+        # concurrent sends would leave the stored order undefined.
         messages = ["First message", "Second message", "Third message"]
+        envelope_prefix = orjson.dumps({"conversation_id": conversation_id})[:-1]
         for msg in messages:
             response = await authenticated_client.post(
                 "/chat/message",
-                json={
-                    "conversation_id": conversation_id,
-                    "content": msg,
-                },
+                content=envelope_prefix + b',"content":' + orjson.dumps(msg) + b"}",
+                headers=JSON_HEADERS,
             )
             assert response.status_code == 200
         
@@ -195,11 +234,12 @@ class TestChatFlow:
             f"/chat/conversations/{conversation_id}/messages"
         )
         assert messages_response.status_code == 200
-        retrieved_messages = messages_response.json()["messages"]
+        retrieved_messages = rjson(messages_response)["messages"]
         
-        # Verify all messages are present
-        user_messages = [m for m in retrieved_messages if m.get("role") == "user"]
+        # Verify all messages are present, in the order they were sent
+        user_messages = group_by_role(retrieved_messages)["user"]
         assert len(user_messages) >= len(messages), "Not all messages retrieved"
+        assert [m["content"] for m in user_messages] == messages, "History out of order"
 
     @pytest.mark.asyncio
     async def test_unauthorized_access_to_other_users_conversation(self, client):
@@ -213,8 +253,8 @@ class TestChatFlow:
             },
         )
         assert user1_response.status_code == 201
-        user1_token = user1_response.json()["access_token"]
-        user1_id = user1_response.json()["user_id"]
+        user1_token = rjson(user1_response)["access_token"]
+        user1_id = rjson(user1_response)["user_id"]
         
         # Create conversation as user1
         user1_headers = {"Authorization": f"Bearer {user1_token}"}
@@ -224,7 +264,7 @@ class TestChatFlow:
             headers=user1_headers,
         )
         assert conv_response.status_code == 200
-        conversation_id = conv_response.json()["id"]
+        conversation_id = rjson(conv_response)["id"]
         
         # Create second user
         user2_response = await client.post(
@@ -235,7 +275,7 @@ class TestChatFlow:
             },
         )
         assert user2_response.status_code == 201
-        user2_token = user2_response.json()["access_token"]
+        user2_token = rjson(user2_response)["access_token"]
         
         # Try to access user1's conversation as user2
         user2_headers = {"Authorization": f"Bearer {user2_token}"}
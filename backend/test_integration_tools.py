@@ -3,7 +3,6 @@ Integration tests for tool integration.
 Tests: Tavily search, Google Trends MCP, tool error handling, MCP unavailability
 """
 import pytest
-import httpx
 import asyncio
 import json
 from typing import Dict, Any
@@ -11,23 +10,51 @@ from typing import Dict, Any
 # Backend API base URL
 BASE_URL = "http://localhost:8000"
 
+# Read timeout for SSE responses
+STREAM_TIMEOUT = 120.0
+
 # Test user credentials
 TEST_PASSWORD = "TestPassword123!"
 
 
+async def _has_events(client, path, payload, drain=False):
+    """
+    POST to an SSE endpoint and report whether any event frame arrives.
+    
+    Scans the raw bytes and, unless `drain` is set, stops reading at the
+    first `event:` marker. Pass `drain=True` when the test needs the agent
+    run to finish (e.g. to check the saved assistant message). Non-200
+    bodies are read in full so `response.text` is available for
+    assertion messages.
+    """
+    # Agent runs with tools can outlast the shared client's default timeout
+    async with client.stream("POST", path, json=payload, timeout=STREAM_TIMEOUT) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return response, False
+        found = False
+        tail = b""
+        async for chunk in response.aiter_bytes():
+            if not found and (b"event:" in chunk or b"event:" in tail + chunk[:5]):
+                found = True
+                if not drain:
+                    break
+            # Keep enough bytes to catch a marker split across chunks
+            tail = chunk[-5:]
+    return response, found
+
+
 class TestToolIntegration:
     """Test tool integration (Tavily, Google Trends MCP)."""
 
-    @pytest.fixture
-    async def client(self):
-        """Create HTTP client for testing."""
-        async with httpx.AsyncClient(base_url=BASE_URL, timeout=120.0) as client:
-            yield client
+    @pytest.fixture(scope="module")
+    def client(self, http_client):
+        """Reuse the session-wide HTTP client."""
+        return http_client
 
-    @pytest.fixture
-    async def authenticated_client(self, client):
-        """Create authenticated HTTP client with a conversation."""
-        # Signup
+    @pytest.fixture(scope="module")
+    async def module_user(self, client):
+        """Sign up one user for the whole module and return its token."""
         import uuid
         unique_id = str(uuid.uuid4())[:8]
         response = await client.post(
@@ -38,10 +65,13 @@ class TestToolIntegration:
             },
         )
         assert response.status_code == 201
-        token = response.json()["access_token"]
-        
-        # Add token to client headers
-        client.headers.update({"Authorization": f"Bearer {token}"})
+        return response.json()["access_token"]
+
+    @pytest.fixture
+    async def authenticated_client(self, client, module_user):
+        """Create authenticated HTTP client with a fresh conversation."""
+        # Add the module user's token to client headers
+        client.headers["Authorization"] = f"Bearer {module_user}"
         
         # Create a conversation
         conv_response = await client.post(
@@ -55,14 +85,18 @@ class TestToolIntegration:
         client.conversation_id = conversation_id
         
         yield client
+        
+        # The client outlives this test, so drop the per-test auth header
+        client.headers.pop("Authorization", None)
 
     @pytest.mark.asyncio
     async def test_tavily_search_invocation(self, authenticated_client):
         """Test that Tavily search is invoked for web queries."""
         # Send a message that should trigger Tavily search
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "What are the latest AI trends in 2026?",
             },
@@ -70,28 +104,19 @@ class TestToolIntegration:
         
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
-        # Parse SSE stream to check for tool activity
-        events = []
-        for line in response.text.split("\n"):
-            if line.startswith("event:"):
-                event_type = line.split(":", 1)[1].strip()
-                events.append(event_type)
-        
         # Should have at least some events (token, tool activity, etc.)
-        assert len(events) > 0, "No SSE events received"
-        
-        # Check if tool activity events are present
-        tool_events = [e for e in events if "tool" in e.lower()]
         # Note: Tool events may or may not be present depending on agent behavior
         # This test just verifies the stream works
+        assert has_events, "No SSE events received"
 
     @pytest.mark.asyncio
     async def test_tavily_results_parsing(self, authenticated_client):
         """Test that Tavily results are parsed correctly."""
         # Send a message that should trigger Tavily search
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "Search for information about machine learning",
             },
@@ -100,7 +125,7 @@ class TestToolIntegration:
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
         # Verify response is valid SSE stream
-        assert "event:" in response.text, "Response should contain SSE events"
+        assert has_events, "Response should contain SSE events"
         
         # Retrieve messages to verify user message was saved
         messages_response = await authenticated_client.get(
@@ -120,9 +145,10 @@ class TestToolIntegration:
     async def test_tavily_error_handling(self, authenticated_client):
         """Test that Tavily errors are handled gracefully."""
         # Send a message with an empty query (edge case)
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "   ",  # Empty/whitespace only
             },
@@ -132,15 +158,16 @@ class TestToolIntegration:
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
         # Verify response contains events
-        assert "event:" in response.text, "Response should contain SSE events"
+        assert has_events, "Response should contain SSE events"
 
     @pytest.mark.asyncio
     async def test_google_trends_mcp_invocation(self, authenticated_client):
         """Test that Google Trends MCP is invoked for trends queries."""
         # Send a message that should trigger Google Trends MCP
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "What are the trending topics right now?",
             },
@@ -148,32 +175,27 @@ class TestToolIntegration:
         
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
-        # Parse SSE stream
-        events = []
-        for line in response.text.split("\n"):
-            if line.startswith("event:"):
-                event_type = line.split(":", 1)[1].strip()
-                events.append(event_type)
-        
         # Should have at least some events
-        assert len(events) > 0, "No SSE events received"
+        assert has_events, "No SSE events received"
 
     @pytest.mark.asyncio
     async def test_mcp_data_parsing(self, authenticated_client):
         """Test that MCP data is parsed correctly."""
         # Send a message that should trigger MCP
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "Get trending data for technology",
             },
+            drain=True,
         )
         
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
         # Verify response is valid SSE stream
-        assert "event:" in response.text, "Response should contain SSE events"
+        assert has_events, "Response should contain SSE events"
         
         # Retrieve messages to verify response was saved
         messages_response = await authenticated_client.get(
@@ -182,16 +204,18 @@ class TestToolIntegration:
         assert messages_response.status_code == 200
         messages = messages_response.json()["messages"]
         
-        # Should have messages
-        assert len(messages) > 0, "Should have messages"
+        # The stream was drained, so the agent's answer has been saved too
+        roles = [m.get("role") for m in messages]
+        assert "assistant" in roles, "Agent response should be saved"
 
     @pytest.mark.asyncio
     async def test_mcp_unavailability_handling(self, authenticated_client):
         """Test that MCP unavailability is handled gracefully."""
         # Send a message that might trigger MCP
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "Tell me about current trends",
             },
@@ -201,15 +225,16 @@ class TestToolIntegration:
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
         # Verify response contains events (even if MCP is unavailable)
-        assert "event:" in response.text, "Response should contain SSE events"
+        assert has_events, "Response should contain SSE events"
 
     @pytest.mark.asyncio
     async def test_tool_timeout_handling(self, authenticated_client):
         """Test that tool timeouts are handled gracefully."""
         # Send a message that might timeout
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "Search for very specific information that might timeout",
             },
@@ -219,31 +244,26 @@ class TestToolIntegration:
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
         # Verify response contains events
-        assert "event:" in response.text, "Response should contain SSE events"
+        assert has_events, "Response should contain SSE events"
 
     @pytest.mark.asyncio
     async def test_multiple_tool_invocations(self, authenticated_client):
         """Test that multiple tools can be invoked in sequence."""
         # Send a complex message that might trigger multiple tools
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "Compare current AI trends with web search results",
             },
+            drain=True,
         )
         
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
-        # Parse SSE stream
-        events = []
-        for line in response.text.split("\n"):
-            if line.startswith("event:"):
-                event_type = line.split(":", 1)[1].strip()
-                events.append(event_type)
-        
         # Should have events
-        assert len(events) > 0, "No SSE events received"
+        assert has_events, "No SSE events received"
         
         # Verify response was saved
         messages_response = await authenticated_client.get(
@@ -252,16 +272,18 @@ class TestToolIntegration:
         assert messages_response.status_code == 200
         messages = messages_response.json()["messages"]
         
-        # Should have messages
-        assert len(messages) > 0, "Should have messages"
+        # The stream was drained, so the agent's answer has been saved too
+        roles = [m.get("role") for m in messages]
+        assert "assistant" in roles, "Agent response should be saved"
 
     @pytest.mark.asyncio
     async def test_tool_activity_indicators(self, authenticated_client):
         """Test that tool activity indicators are displayed during tool use."""
         # Send a message that should trigger tools
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "What are the latest developments in AI?",
             },
@@ -269,23 +291,17 @@ class TestToolIntegration:
         
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
-        # Parse SSE stream to look for tool activity events
-        lines = response.text.split("\n")
-        has_events = False
-        for line in lines:
-            if line.startswith("event:"):
-                has_events = True
-                break
-        
+        # Stream should contain SSE events
         assert has_events, "Response should contain SSE events"
 
     @pytest.mark.asyncio
     async def test_agent_iteration_limit(self, authenticated_client):
         """Test that agent respects iteration limit."""
         # Send a message that might cause many iterations
-        response = await authenticated_client.post(
+        response, has_events = await _has_events(
+            authenticated_client,
             "/chat/message",
-            json={
+            {
                 "conversation_id": authenticated_client.conversation_id,
                 "content": "Perform a very complex analysis with multiple steps",
             },
@@ -295,7 +311,7 @@ class TestToolIntegration:
         assert response.status_code == 200, f"Message send failed: {response.text}"
         
         # Verify response contains events
-        assert "event:" in response.text, "Response should contain SSE events"
+        assert has_events, "Response should contain SSE events"
 
 
 if __name__ == "__main__":
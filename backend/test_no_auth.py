@@ -9,6 +9,9 @@ from app.routers import health
 
 app = FastAPI(title="Test No Auth")
 
+# CORS origin matching relies on O(1) set membership
+assert isinstance(settings.cors_origins, (tuple, frozenset))
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
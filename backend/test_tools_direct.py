@@ -4,6 +4,7 @@ Direct tool testing - run this to debug tool issues.
 """
 
 import asyncio
+import io
 import sys
 import os
 
@@ -14,86 +15,88 @@ from app.services.tools.google_trends_mcp import google_trends_tool
 from app.core.config import settings
 
 
-async def test_tavily():
+async def test_tavily(out=None):
     """Test Tavily search tool."""
-    print("\n" + "=" * 70)
-    print("TESTING TAVILY SEARCH")
-    print("=" * 70)
+    out = out or sys.stdout
+    print("\n" + "=" * 70, file=out)
+    print("TESTING TAVILY SEARCH", file=out)
+    print("=" * 70, file=out)
     
-    print(f"API Key: {settings.tavily_api_key[:20]}...")
-    print(f"Query: 'LangChain agents'")
-    print("-" * 70)
+    print(f"API Key: {settings.tavily_api_key[:20]}...", file=out)
+    print(f"Query: 'LangChain agents'", file=out)
+    print("-" * 70, file=out)
     
     try:
         result = await tavily_tool.search("LangChain agents", max_results=3)
         
-        print(f"Success: {result['success']}")
+        print(f"Success: {result['success']}", file=out)
         
         if result['success']:
-            print(f"Results found: {len(result['results'])}")
+            print(f"Results found: {len(result['results'])}", file=out)
             if result['answer']:
-                print(f"Answer: {result['answer'][:150]}...")
+                print(f"Answer: {result['answer'][:150]}...", file=out)
             if result['results']:
-                print(f"\nTop result:")
-                print(f"  Title: {result['results'][0].get('title', 'N/A')}")
-                print(f"  URL: {result['results'][0].get('url', 'N/A')}")
-            print("\n✅ TAVILY WORKS")
+                print(f"\nTop result:", file=out)
+                print(f"  Title: {result['results'][0].get('title', 'N/A')}", file=out)
+                print(f"  URL: {result['results'][0].get('url', 'N/A')}", file=out)
+            print("\n✅ TAVILY WORKS", file=out)
         else:
-            print(f"Error: {result['error']}")
-            print("\n❌ TAVILY FAILED")
+            print(f"Error: {result['error']}", file=out)
+            print("\n❌ TAVILY FAILED", file=out)
     
     except Exception as e:
-        print(f"Exception: {str(e)}")
+        print(f"Exception: {str(e)}", file=out)
         import traceback
-        traceback.print_exc()
-        print("\n❌ TAVILY EXCEPTION")
+        traceback.print_exc(file=out)
+        print("\n❌ TAVILY EXCEPTION", file=out)
 
 
-async def test_mcp():
+async def test_mcp(out=None):
     """Test Google Trends MCP tool."""
-    print("\n" + "=" * 70)
-    print("TESTING GOOGLE TRENDS MCP")
-    print("=" * 70)
+    out = out or sys.stdout
+    print("\n" + "=" * 70, file=out)
+    print("TESTING GOOGLE TRENDS MCP", file=out)
+    print("=" * 70, file=out)
     
-    print(f"MCP URL: {settings.mcp_url}")
-    print(f"MCP Timeout: {settings.mcp_timeout}s")
-    print("-" * 70)
+    print(f"MCP URL: {settings.mcp_url}", file=out)
+    print(f"MCP Timeout: {settings.mcp_timeout}s", file=out)
+    print("-" * 70, file=out)
     
     try:
         # First check health
-        print("Checking MCP health...")
+        print("Checking MCP health...", file=out)
         health = await google_trends_tool.health_check()
-        print(f"Health check: {health}")
+        print(f"Health check: {health}", file=out)
         
         if not health:
-            print("⚠️  MCP health check failed - service may be down")
+            print("⚠️  MCP health check failed - service may be down", file=out)
         
         # Try to get trends
-        print("\nFetching trends...")
+        print("\nFetching trends...", file=out)
         result = await google_trends_tool.get_trending_terms()
         
-        print(f"Success: {result['success']}")
+        print(f"Success: {result['success']}", file=out)
         
         if result['success']:
             trends = result['trends']
-            print(f"Trends found: {len(trends)}")
+            print(f"Trends found: {len(trends)}", file=out)
             if trends:
-                print(f"Top trends:")
+                print(f"Top trends:", file=out)
                 for i, trend in enumerate(trends[:3], 1):
                     if isinstance(trend, dict):
-                        print(f"  {i}. {trend.get('keyword', 'N/A')} (Volume: {trend.get('volume', 'N/A')})")
+                        print(f"  {i}. {trend.get('keyword', 'N/A')} (Volume: {trend.get('volume', 'N/A')})", file=out)
                     else:
-                        print(f"  {i}. {trend}")
-            print("\n✅ MCP WORKS")
+                        print(f"  {i}. {trend}", file=out)
+            print("\n✅ MCP WORKS", file=out)
         else:
-            print(f"Error: {result['error']}")
-            print("\n❌ MCP FAILED")
+            print(f"Error: {result['error']}", file=out)
+            print("\n❌ MCP FAILED", file=out)
     
     except Exception as e:
-        print(f"Exception: {str(e)}")
+        print(f"Exception: {str(e)}", file=out)
         import traceback
-        traceback.print_exc()
-        print("\n❌ MCP EXCEPTION")
+        traceback.print_exc(file=out)
+        print("\n❌ MCP EXCEPTION", file=out)
 
 
 async def main():
@@ -102,8 +105,12 @@ async def main():
     print("TOOL DEBUGGING TEST")
     print("=" * 70)
     
-    await test_tavily()
-    await test_mcp()
+    # Both tools are independent and I/O-bound, so run them concurrently and
+    # flush each one's buffered output afterwards to avoid interleaving
+    tavily_out, mcp_out = io.StringIO(), io.StringIO()
+    await asyncio.gather(test_tavily(tavily_out), test_mcp(mcp_out))
+    print(tavily_out.getvalue(), end="")
+    print(mcp_out.getvalue(), end="")
     
     print("\n" + "=" * 70)
     print("TEST COMPLETE")
@@ -111,4 +118,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Prefer uvloop's faster event loop when it is installed
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())